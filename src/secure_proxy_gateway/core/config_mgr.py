@@ -1,34 +1,60 @@
 import json
 import os
 import shutil
-import tempfile
 import threading
 from pathlib import Path
 from typing import Literal, Optional
 
+import orjson
 import yaml
 from pydantic import ValidationError
 
 from secure_proxy_gateway.core.exceptions import ConfigError
 from secure_proxy_gateway.core.models import SystemConfig
 
+try:
+    from yaml import CSafeDumper as _YamlDumper, CSafeLoader as _YamlLoader
+
+    YAML_LIBYAML = True
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper as _YamlDumper, SafeLoader as _YamlLoader
+
+    YAML_LIBYAML = False
+
 CONFIG_FORMAT = Literal["yaml", "json"]
 
 ENV_CONFIG_PATH = "SPG_CONFIG_PATH"
 DEFAULT_CONFIG_BASENAME = "config.yaml"
+# How many parent directories the CWD search visits before giving up.
+MAX_CONFIG_SEARCH_DEPTH = 16
 
 _write_lock = threading.Lock()
 
+# fdatasync flushes the data and the size but skips metadata such as mtime, which
+# os.replace does not need; platforms without it (e.g. macOS) use fsync.
+_sync_file_data = getattr(os, "fdatasync", os.fsync)
+
+# The tmp name is predictable, so never open through an existing file or symlink.
+_TMP_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_NOFOLLOW", 0)
+
+# Validate already parsed config data (a dict) into a SystemConfig; pydantic-core's
+# validator bound once and shared by every parse path and the admin API.
+validate_config_data = SystemConfig.__pydantic_validator__.validate_python
+
+# Per-path snapshot reused while (st_mtime_ns, st_size) is unchanged:
+# (signature, raw text, format, validated config or None until load_config runs).
+_file_cache: dict[Path, tuple[tuple[int, int], str, CONFIG_FORMAT, SystemConfig | None]] = {}
 
 def _find_config_upwards(start: Path, basename: str) -> Path | None:
     current = start
-    while True:
+    for _ in range(MAX_CONFIG_SEARCH_DEPTH + 1):
         candidate = current / basename
         if candidate.exists():
             return candidate
         if current.parent == current:
-            return None
+            break
         current = current.parent
+    return None
 
 
 def resolve_config_path(path: Path | str | None = None) -> Path:
@@ -57,56 +83,133 @@ def _load_raw_text(path: Path) -> str:
     return path.read_text(encoding="utf-8")
 
 
+def _file_signature(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _snapshot(
+    path: Path, signature: tuple[int, int]
+) -> tuple[str, CONFIG_FORMAT, SystemConfig | None]:
+    cached = _file_cache.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1], cached[2], cached[3]
+    raw_text = _load_raw_text(path)
+    fmt = detect_config_format(raw_text)
+    _file_cache[path] = (signature, raw_text, fmt, None)
+    return raw_text, fmt, None
+
+
 def _parse_config(text: str, fmt: CONFIG_FORMAT) -> dict:
     if fmt == "json":
-        return json.loads(text or "{}")
-    return yaml.safe_load(text) or {}
+        try:
+            return orjson.loads(text or "{}")
+        except orjson.JSONDecodeError:
+            # orjson is strict; the stdlib also accepts the Infinity/NaN that save_config writes.
+            return json.loads(text)
+    return yaml.load(text, Loader=_YamlLoader) or {}
+
+
+def _normalize_format(fmt: str) -> CONFIG_FORMAT:
+    fmt_lower = str(fmt).strip().lower()
+    if fmt_lower not in {"yaml", "json"}:
+        raise ValueError(f"Unsupported format: {fmt}")
+    return "json" if fmt_lower == "json" else "yaml"
+
+
+def _parse_and_validate(content: str, fmt: CONFIG_FORMAT) -> SystemConfig:
+    try:
+        data = _parse_config(content, fmt)
+    except (ValueError, TypeError, yaml.YAMLError) as exc:
+        raise ConfigError(str(exc)) from exc
+
+    try:
+        return validate_config_data(data)
+    except ValidationError as exc:
+        raise ConfigError(str(exc)) from exc
+
+
+def _backup_file(path: Path, backup_path: Path) -> None:
+    """Hard-link the current file as backup; copy when linking is not possible (e.g. EXDEV)."""
+    try:
+        backup_path.unlink(missing_ok=True)
+        os.link(path, backup_path)
+    except OSError:
+        shutil.copy(path, backup_path)
+
+
+def _read_bytes(path: Path) -> bytes | None:
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
 
 
 def _atomic_write_text(path: Path, content: str) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     backup_path = Path(str(path) + ".bak")
+    encoded = content.encode("utf-8")
 
     with _write_lock:
-        if path.exists():
-            shutil.copy(path, backup_path)
-
-        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
-        tmp_file = Path(tmp_path)
+        existing = _read_bytes(path)
+        if existing == encoded:
+            # Unchanged content: keep the file, its mtime and the previous backup as they are.
+            return
+        if existing is not None:
+            # os.replace below swaps in a new inode, so the link keeps the old content.
+            _backup_file(path, backup_path)
+
+        # Writers in this process are serialized by _write_lock; the pid separates processes.
+        tmp_file = path.with_name(f"{path.name}.tmp.{os.getpid()}")
+        # A leftover from a crashed write is removed (a symlink is unlinked, not followed).
+        tmp_file.unlink(missing_ok=True)
         try:
-            with os.fdopen(fd, "w", encoding="utf-8") as fh:
-                fh.write(content)
+            fd = os.open(tmp_file, _TMP_OPEN_FLAGS, 0o600)
+            try:
+                data = memoryview(encoded)
+                while data:
+                    data = data[os.write(fd, data) :]
+                _sync_file_data(fd)
+            finally:
+                os.close(fd)
             os.replace(tmp_file, path)
         finally:
-            if tmp_file.exists():
-                tmp_file.unlink(missing_ok=True)
+            tmp_file.unlink(missing_ok=True)
 
 
 def read_raw_config(path: Path | str | None = None) -> tuple[str, CONFIG_FORMAT]:
     """Return raw config content and detected format."""
     resolved = resolve_config_path(path)
-    content = _load_raw_text(resolved)
-    return content, detect_config_format(content)
+    signature = _file_signature(resolved)
+    if signature is None:
+        return "", detect_config_format("")
+    content, fmt, _ = _snapshot(resolved, signature)
+    return content, fmt
 
 
-def load_config(path: Path | str | None = None) -> SystemConfig:
-    """Load configuration from YAML/JSON file."""
+def load_config_full(path: Path | str | None = None) -> tuple[SystemConfig, str, CONFIG_FORMAT]:
+    """Load configuration together with its raw content and format from a single read."""
     resolved = resolve_config_path(path)
-    raw_text = _load_raw_text(resolved)
-    fmt = detect_config_format(raw_text)
+    signature = _file_signature(resolved)
+    if signature is None:
+        return SystemConfig(), "", detect_config_format("")
 
-    if not raw_text.strip() and not resolved.exists():
-        return SystemConfig()
+    raw_text, fmt, cached_config = _snapshot(resolved, signature)
+    if cached_config is not None:
+        # Callers may mutate what they get back, so hand out a copy of the cached model.
+        return cached_config.model_copy(deep=True), raw_text, fmt
 
-    try:
-        data = _parse_config(raw_text, fmt)
-    except (ValueError, TypeError, yaml.YAMLError) as exc:
-        raise ConfigError(str(exc)) from exc
+    config = _parse_and_validate(raw_text, fmt)
+    _file_cache[resolved] = (signature, raw_text, fmt, config.model_copy(deep=True))
+    return config, raw_text, fmt
 
-    try:
-        return SystemConfig.model_validate(data)
-    except ValidationError as exc:
-        raise ConfigError(str(exc)) from exc
+
+def load_config(path: Path | str | None = None) -> SystemConfig:
+    """Load configuration from YAML/JSON file."""
+    return load_config_full(path)[0]
 
 
 def save_config(
@@ -114,38 +217,28 @@ def save_config(
     path: Path | str | None = None,
     fmt: Optional[CONFIG_FORMAT] = None,
     minimal: bool = False,
-) -> None:
-    """Persist configuration with backup and atomic write."""
+) -> str:
+    """Persist configuration with backup and atomic write; returns the written content."""
     resolved = resolve_config_path(path)
     if fmt is None:
         raw_text = _load_raw_text(resolved)
         fmt = detect_config_format(raw_text)
 
+    # Dump to Python values rather than JSON: JSON serializers turn inf/nan into null,
+    # which would write a config that no longer validates.
     data = config.model_dump(exclude_defaults=minimal, exclude_none=minimal)
     if fmt == "json":
         content = json.dumps(data, ensure_ascii=False, indent=2)
     else:
-        content = yaml.safe_dump(data, allow_unicode=True, sort_keys=False)
+        content = yaml.dump(data, Dumper=_YamlDumper, allow_unicode=True, sort_keys=False)
 
     _atomic_write_text(resolved, content)
+    return content
 
 
 def validate_config_raw(content: str, fmt: CONFIG_FORMAT = "yaml") -> SystemConfig:
     """Validate raw config content (yaml/json) and return parsed config without writing."""
-    fmt_lower = str(fmt).strip().lower()
-    if fmt_lower not in {"yaml", "json"}:
-        raise ValueError(f"Unsupported format: {fmt}")
-    fmt_typed: CONFIG_FORMAT = "json" if fmt_lower == "json" else "yaml"
-
-    try:
-        data = _parse_config(content, fmt_typed)
-    except (ValueError, TypeError, yaml.YAMLError) as exc:
-        raise ConfigError(str(exc)) from exc
-
-    try:
-        return SystemConfig.model_validate(data)
-    except ValidationError as exc:
-        raise ConfigError(str(exc)) from exc
+    return _parse_and_validate(content, _normalize_format(fmt))
 
 
 def save_config_raw(
@@ -154,21 +247,7 @@ def save_config_raw(
     path: Path | str | None = None,
 ) -> SystemConfig:
     """Persist raw config content (yaml/json) while validating structure."""
-    fmt_lower = str(fmt).strip().lower()
-    if fmt_lower not in {"yaml", "json"}:
-        raise ValueError(f"Unsupported format: {fmt}")
-    fmt_typed: CONFIG_FORMAT = "json" if fmt_lower == "json" else "yaml"
-
-    try:
-        data = _parse_config(content, fmt_typed)
-    except (ValueError, TypeError, yaml.YAMLError) as exc:
-        raise ConfigError(str(exc)) from exc
-
-    try:
-        cfg = SystemConfig.model_validate(data)
-    except ValidationError as exc:
-        raise ConfigError(str(exc)) from exc
-
+    cfg = _parse_and_validate(content, _normalize_format(fmt))
     resolved = resolve_config_path(path)
     _atomic_write_text(resolved, content)
     return cfg
@@ -4,3 +4,7 @@ class ConfigError(Exception):
 
 class RouteNotFound(Exception):
     """Raised when no matching route is found for a request."""
+
+
+class RequestTooLarge(Exception):
+    """Raised when an incoming request body exceeds proxy.max_request_size."""
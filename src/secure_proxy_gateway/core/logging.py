@@ -1,10 +1,29 @@
-import json
 import logging
+import time
+
+import orjson
+
+_EXTRA_KEYS = ("request_id", "route_name", "upstream_ms", "status_code", "method", "path")
 
 
 class JSONFormatter(logging.Formatter):
     """Structured JSON formatter for logs."""
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # (whole second, strftime text) of the last record; records share a second under load.
+        self._time_cache: tuple[int, str] = (-1, "")
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        second = int(record.created)
+        cached_second, text = self._time_cache
+        if cached_second != second:
+            text = time.strftime(self.default_time_format, self.converter(record.created))
+            self._time_cache = (second, text)
+        return self.default_msec_format % (text, record.msecs)
+
     def format(self, record: logging.LogRecord) -> str:
         log_data = {
             "timestamp": self.formatTime(record),
@@ -12,10 +31,12 @@ class JSONFormatter(logging.Formatter):
             "message": record.getMessage(),
             "module": record.module,
         }
-        for key in ("request_id", "route_name", "upstream_ms", "status_code", "method", "path"):
-            if hasattr(record, key):
-                log_data[key] = getattr(record, key)
-        return json.dumps(log_data, ensure_ascii=False)
+        attrs = record.__dict__  # logging stores `extra` entries here
+        for key in _EXTRA_KEYS:
+            value = attrs.get(key)
+            if value is not None:
+                log_data[key] = value
+        return orjson.dumps(log_data).decode()
 
 
 def configure_logging(level: int = logging.INFO) -> None:
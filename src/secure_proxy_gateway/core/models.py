@@ -1,7 +1,10 @@
 import re
-from typing import Dict, List, Optional
+import sys
+from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, PrivateAttr, field_validator, model_validator
+
+from ..proxy.masking import MaskSet
 
 
 class TimeoutConfig(BaseModel):
@@ -13,6 +16,11 @@ class TimeoutConfig(BaseModel):
 class ProxyConfig(BaseModel):
     timeout: TimeoutConfig = Field(default_factory=TimeoutConfig)
     max_response_size: int = 10 * 1024 * 1024  # 10MB
+    max_request_size: int = 0  # 0 = unlimited
+    http2: bool = False  # negotiated via ALPN, https upstreams only
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 5.0  # seconds an idle upstream connection is kept
     strip_headers: List[str] = Field(
         default_factory=lambda: [
             "Host",
@@ -25,6 +33,16 @@ class ProxyConfig(BaseModel):
         ]
     )
 
+    _strip_header_set: frozenset[bytes] = PrivateAttr(default=frozenset())
+
+    def model_post_init(self, __context: Any) -> None:
+        self._strip_header_set = frozenset(h.lower().encode("latin-1") for h in self.strip_headers)
+
+    @property
+    def strip_header_set(self) -> frozenset[bytes]:
+        """Lower-cased strip_headers as raw bytes, matching ASGI header names."""
+        return self._strip_header_set
+
 
 class ServerConfig(BaseModel):
     port: int = 8000
@@ -37,25 +55,74 @@ class RequestRules(BaseModel):
     add_headers: Dict[str, str] = Field(default_factory=dict)
     del_params: List[str] = Field(default_factory=list)
 
+    _replaced_param_keys: frozenset[str] = PrivateAttr(default=frozenset())
+    _appended_params: tuple[tuple[str, str], ...] = PrivateAttr(default=())
+    _raw_add_headers: dict[bytes, bytes] = PrivateAttr(default_factory=dict)
+
+    def model_post_init(self, __context: Any) -> None:
+        del_keys = frozenset(self.del_params)
+        self._replaced_param_keys = del_keys.union(self.add_params)
+        self._appended_params = tuple((k, v) for k, v in self.add_params.items() if k not in del_keys)
+        self._raw_add_headers = {
+            k.lower().encode("utf-8"): v.encode("utf-8") for k, v in self.add_headers.items()
+        }
+
+    @property
+    def replaced_param_keys(self) -> frozenset[str]:
+        """Incoming query keys to drop: deleted ones plus those overridden by add_params."""
+        return self._replaced_param_keys
+
+    @property
+    def appended_params(self) -> tuple[tuple[str, str], ...]:
+        """add_params entries that survive del_params, in configured order."""
+        return self._appended_params
+
+    @property
+    def raw_add_headers(self) -> dict[bytes, bytes]:
+        """add_headers keyed by lower-cased raw name, ready to merge into ASGI header pairs."""
+        return self._raw_add_headers
+
 
 class MaskRule(BaseModel):
     pattern: str
     replacement: str
 
+    _compiled: re.Pattern[str] = PrivateAttr()
+
     @field_validator("pattern")
     @classmethod
     def validate_pattern(cls, value: str) -> str:
         if len(value) > 500:
             raise ValueError("正则表达式长度不能超过 500 字符")
+        return value
+
+    @model_validator(mode="after")
+    def compile_pattern(self) -> "MaskRule":
+        # Compile once during validation and keep the result for masking.
         try:
-            re.compile(value)
+            self._compiled = re.compile(self.pattern)
         except re.error as exc:
             raise ValueError(f"无效的正则表达式: {exc}")
-        return value
+        return self
+
+    @property
+    def compiled(self) -> re.Pattern[str]:
+        return self._compiled
 
 
 class ResponseRules(BaseModel):
     mask_regex: List[MaskRule] = Field(default_factory=list)
+    mask_single_pass: bool = False  # scan once; only the first matching rule applies at a position
+
+    _mask_set: MaskSet = PrivateAttr()
+
+    def model_post_init(self, __context: Any) -> None:
+        self._mask_set = MaskSet(self.mask_regex, single_pass=self.mask_single_pass)
+
+    @property
+    def mask_set(self) -> MaskSet:
+        """mask_regex prepared for masking, built once per validated config."""
+        return self._mask_set
 
 
 class RouteConfig(BaseModel):
@@ -67,6 +134,8 @@ class RouteConfig(BaseModel):
     request_rules: RequestRules = Field(default_factory=RequestRules)
     response_rules: ResponseRules = Field(default_factory=ResponseRules)
 
+    _target_base: str = PrivateAttr(default="")
+
     @field_validator("path")
     @classmethod
     def ensure_leading_slash(cls, value: str) -> str:
@@ -77,7 +146,16 @@ class RouteConfig(BaseModel):
     @field_validator("method")
     @classmethod
     def normalize_method(cls, value: str) -> str:
-        return value.upper()
+        # Interned so RouteTable's method lookups usually resolve on identity.
+        return sys.intern(value.upper())
+
+    def model_post_init(self, __context: Any) -> None:
+        self._target_base = self.target.rstrip("/")
+
+    @property
+    def target_base(self) -> str:
+        """Target without trailing slash, ready for upstream path concatenation."""
+        return self._target_base
 
 
 class SystemConfig(BaseModel):
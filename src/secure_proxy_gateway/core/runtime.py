@@ -1,16 +1,46 @@
 import asyncio
+import functools
+import ipaddress
+import time
 from pathlib import Path
 
 from starlette.concurrency import run_in_threadpool
 
-from ..core.config_mgr import read_raw_config, load_config
+from ..core.config_mgr import load_config_full
 from ..core.models import SystemConfig
 from ..proxy.client import create_http_client
+from ..proxy.engine import RouteTable
 
+# Proxied requests stat the config file at most once per interval.
+CONFIG_RECHECK_INTERVAL_S = 1.0
 
-def _proxy_timeout_signature(config: SystemConfig) -> tuple[float, float, float]:
-    t = config.proxy.timeout
-    return (float(t.connect), float(t.read), float(t.write))
+
+@functools.lru_cache(maxsize=256)
+def is_loopback_host(host: str) -> bool:
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return host.lower() == "localhost"
+
+
+def _set_admin_state(app, config: SystemConfig) -> None:
+    admin_host = config.server.admin_host
+    app.state.admin_host = admin_host
+    app.state.admin_is_loopback = is_loopback_host(admin_host)
+
+
+def _http_client_signature(config: SystemConfig) -> tuple:
+    proxy = config.proxy
+    t = proxy.timeout
+    return (
+        float(t.connect),
+        float(t.read),
+        float(t.write),
+        proxy.http2,
+        proxy.max_connections,
+        proxy.max_keepalive_connections,
+        float(proxy.keepalive_expiry),
+    )
 
 
 async def _close_client_later(client, delay_s: float = 5.0) -> None:
@@ -21,30 +51,44 @@ async def _close_client_later(client, delay_s: float = 5.0) -> None:
         pass
 
 
-def init_runtime_state(app, config_path: Path, config: SystemConfig, fmt: str, http_client) -> None:
+def init_runtime_state(
+    app, config_path: Path, config: SystemConfig, fmt: str, http_client, raw: str | None = None
+) -> None:
     app.state.config_path = config_path
     app.state.config_format = fmt
+    app.state.config_raw = raw
     app.state.config = config
+    app.state.config_json = None
+    app.state.route_table = RouteTable(config.routes)
+    _set_admin_state(app, config)
     app.state.http_client = http_client
     app.state.config_reload_lock = asyncio.Lock()
+    app.state.config_last_check = time.monotonic()
     app.state.config_mtime = config_path.stat().st_mtime if config_path.exists() else 0.0
-    app.state.http_client_sig = _proxy_timeout_signature(config)
+    app.state.http_client_sig = _http_client_signature(config)
 
 
-async def apply_config(app, config: SystemConfig, fmt: str | None = None) -> None:
+async def apply_config(
+    app, config: SystemConfig, fmt: str | None = None, raw: str | None = None
+) -> None:
     """
     Apply new config to app.state and update http client only when needed.
 
     Route changes should take effect immediately without disrupting in-flight requests.
+    ``raw`` is the file content backing ``config``; when omitted it is re-read on demand.
     """
     if fmt is not None:
         app.state.config_format = fmt
+    app.state.config_raw = raw
     app.state.config = config
+    app.state.config_json = None
+    app.state.route_table = RouteTable(config.routes)
+    _set_admin_state(app, config)
 
     config_path: Path = app.state.config_path
     app.state.config_mtime = config_path.stat().st_mtime if config_path.exists() else 0.0
 
-    new_sig = _proxy_timeout_signature(config)
+    new_sig = _http_client_signature(config)
     old_sig = getattr(app.state, "http_client_sig", None)
     if old_sig == new_sig:
         return
@@ -55,8 +99,18 @@ async def apply_config(app, config: SystemConfig, fmt: str | None = None) -> Non
     asyncio.create_task(_close_client_later(old_client))
 
 
-async def maybe_reload_app_config(app) -> None:
-    """Reload config from disk if mtime has changed (supports multi-worker setups)."""
+async def maybe_reload_app_config(app, force: bool = False) -> None:
+    """
+    Reload config from disk if mtime has changed (supports multi-worker setups).
+
+    Unless ``force`` is set, the mtime check is skipped when the previous one ran
+    less than CONFIG_RECHECK_INTERVAL_S ago.
+    """
+    now = time.monotonic()
+    if not force and now - app.state.config_last_check < CONFIG_RECHECK_INTERVAL_S:
+        return
+    app.state.config_last_check = now
+
     config_path: Path = app.state.config_path
     try:
         mtime = config_path.stat().st_mtime
@@ -74,6 +128,5 @@ async def maybe_reload_app_config(app) -> None:
         if mtime2 <= getattr(app.state, "config_mtime", 0.0):
             return
 
-        config = await run_in_threadpool(load_config, config_path)
-        _, fmt = await run_in_threadpool(read_raw_config, config_path)
-        await apply_config(app, config, fmt)
+        config, raw, fmt = await run_in_threadpool(load_config_full, config_path)
+        await apply_config(app, config, fmt, raw)
@@ -13,5 +13,10 @@ def create_http_client(config: SystemConfig) -> httpx.AsyncClient:
             pool=config.proxy.timeout.read,
         ),
         follow_redirects=False,
-        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        http2=config.proxy.http2,
+        limits=httpx.Limits(
+            max_connections=config.proxy.max_connections,
+            max_keepalive_connections=config.proxy.max_keepalive_connections,
+            keepalive_expiry=config.proxy.keepalive_expiry,
+        ),
     )
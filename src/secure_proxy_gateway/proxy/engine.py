@@ -1,75 +1,137 @@
+import codecs
+import functools
+import itertools
 import logging
+import os
+import sys
 import time
-import uuid
-from typing import Iterable, Mapping
+from typing import AbstractSet, AsyncIterator, Iterable, Mapping
 
 import httpx
 from fastapi import Request
-from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from starlette.background import BackgroundTask
 
+from ..core.exceptions import RequestTooLarge
 from ..core.models import RequestRules, RouteConfig, SystemConfig
-from ..proxy.masking import MASKABLE_CONTENT_TYPES, mask_content
+from ..core.responses import ORJSONResponse
+from ..proxy.masking import MASKABLE_CONTENT_TYPES, MaskSet, mask_content
 
 logger = logging.getLogger(__name__)
 
+# Request ids only need to be unique enough to correlate logs, not unguessable.
+_REQUEST_ID_PREFIX = f"{os.getpid():x}-"
+_request_ids = itertools.count(1)
 
-def match_route(path: str, method: str, routes: Iterable[RouteConfig]) -> tuple[RouteConfig | None, bool]:
+_ROUTE_CACHE_SIZE = 4096
+
+# Hop-by-hop headers describe the upstream connection, not the response; e.g. a forwarded
+# "connection: close" would make the server drop the client's keep-alive connection.
+_HOP_BY_HOP_HEADERS = frozenset(
+    {b"connection", b"keep-alive", b"proxy-connection", b"transfer-encoding", b"upgrade"}
+)
+_PASSTHROUGH_DROP_HEADERS = _HOP_BY_HOP_HEADERS | {b"x-request-id"}
+# Bodies read through aiter_bytes are already decompressed and re-framed by the gateway.
+_DECODED_DROP_HEADERS = _PASSTHROUGH_DROP_HEADERS | {b"content-length", b"content-encoding"}
+
+_READ_CHUNK_SIZE = 64 * 1024
+
+
+class RouteTable:
     """
-    Match route by longest prefix. Returns (route, has_path_match).
+    Routes indexed by exact path prefix, then by method.
 
-    - has_path_match=False => no prefix match (404)
-    - has_path_match=True and route=None => prefix exists but method not allowed (405)
+    A lookup probes the request path truncated to each distinct prefix length,
+    longest first, so its cost depends on how many lengths exist rather than on
+    how many routes are configured.
     """
-    candidates = [route for route in routes if path.startswith(route.path)]
-    if not candidates:
+
+    __slots__ = ("_by_prefix", "_lengths", "match")
+
+    def __init__(self, routes: Iterable[RouteConfig]) -> None:
+        grouped: dict[str, dict[str, RouteConfig]] = {}
+        for route in routes:
+            # First route wins for a duplicated (path, method), as with the ordered scan.
+            grouped.setdefault(route.path, {}).setdefault(route.method, route)
+        self._by_prefix = grouped
+        self._lengths = tuple(sorted({len(prefix) for prefix in grouped}, reverse=True))
+        # Hot (path, method) pairs resolve from the cache; a new table is built on config change.
+        self.match = functools.lru_cache(maxsize=_ROUTE_CACHE_SIZE)(self._match)
+
+    def _match(self, path: str, method: str) -> tuple[RouteConfig | None, bool]:
+        by_prefix = self._by_prefix
+        method = sys.intern(method.upper())
+        for length in self._lengths:
+            by_method = by_prefix.get(path[:length])
+            if by_method is not None:
+                route = by_method.get(method)
+                if route is None:
+                    route = by_method.get("*")
+                return route, True
         return None, False
 
-    max_len = max(len(route.path) for route in candidates)
-    best = [route for route in candidates if len(route.path) == max_len]
 
-    method_upper = method.upper()
-    for route in best:
-        if route.method != "*" and route.method.upper() == method_upper:
-            return route, True
-    for route in best:
-        if route.method == "*":
-            return route, True
-    return None, True
+def match_route(
+    path: str, method: str, routes: RouteTable | Iterable[RouteConfig]
+) -> tuple[RouteConfig | None, bool]:
+    """
+    Match route by longest prefix. Returns (route, has_path_match).
+
+    - has_path_match=False => no prefix match (404)
+    - has_path_match=True and route=None => prefix exists but method not allowed (405)
+    """
+    table = routes if isinstance(routes, RouteTable) else RouteTable(routes)
+    return table.match(path, method)
 
 
 def merge_params(query_params: Mapping[str, str], rules: RequestRules) -> list[tuple[str, str]]:
     """Merge incoming query params with configured add/del rules, preserving multi-values."""
-    del_keys = set(rules.del_params)
-    add_keys = set(rules.add_params.keys())
+    drop_keys = rules.replaced_param_keys
     if hasattr(query_params, "multi_items"):
         incoming_items = list(query_params.multi_items())  # type: ignore[attr-defined]
     else:
         incoming_items = list(query_params.items())
-    merged = [
-        (key, value)
-        for key, value in incoming_items
-        if key not in del_keys and key not in add_keys
-    ]
-    for key, value in rules.add_params.items():
-        if key not in del_keys:
-            merged.append((key, value))
+    merged = [(key, value) for key, value in incoming_items if key not in drop_keys]
+    merged.extend(rules.appended_params)
     return merged
 
 
 def clean_headers(
-    headers: Mapping[str, str], strip_list: Iterable[str], add_headers: Mapping[str, str]
-) -> dict:
-    """Remove hop-by-hop headers and append configured headers."""
-    blacklist = {h.lower() for h in strip_list}
-    cleaned = {k: v for k, v in headers.items() if k.lower() not in blacklist}
-    cleaned.update(add_headers)
+    raw_headers: Iterable[tuple[bytes, bytes]],
+    strip_set: AbstractSet[bytes],
+    add_headers: Mapping[bytes, bytes],
+) -> list[tuple[bytes, bytes]]:
+    """
+    Remove hop-by-hop headers and append configured headers.
+
+    ``raw_headers`` are ASGI pairs, whose names are already lower-case, so they are
+    compared as bytes against ``strip_set``. ``add_headers`` (lower-cased names)
+    replace any incoming header of the same name.
+    """
+    cleaned = [
+        (key, value)
+        for key, value in raw_headers
+        if key not in strip_set and key not in add_headers
+    ]
+    cleaned.extend(add_headers.items())
     return cleaned
 
 
+async def _request_body(request: Request, max_size: int) -> AsyncIterator[bytes]:
+    """Relay the incoming body chunk by chunk, enforcing ``max_size`` when it is set."""
+    received = 0
+    async for chunk in request.stream():
+        if max_size:
+            received += len(chunk)
+            if received > max_size:
+                raise RequestTooLarge(received)
+        if chunk:
+            yield chunk
+
+
 def _request_id(request: Request) -> str:
     value = request.headers.get("X-Request-Id")
-    return value or str(uuid.uuid4())[:8]
+    return value or f"{_REQUEST_ID_PREFIX}{next(_request_ids):x}"
 
 
 def error_response(
@@ -77,10 +139,10 @@ def error_response(
     message: str,
     request: Request,
     request_id: str | None = None,
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Generate unified error response."""
     request_id = request_id or _request_id(request)
-    response = JSONResponse(
+    response = ORJSONResponse(
         status_code=status_code,
         content={
             "error": message,
@@ -92,45 +154,100 @@ def error_response(
     return response
 
 
+def _response_headers(
+    upstream_resp: httpx.Response, request_id: str, drop: AbstractSet[bytes]
+) -> list[tuple[bytes, bytes]]:
+    """Upstream headers as raw pairs (repeated ones such as Set-Cookie kept) plus X-Request-Id."""
+    headers = []
+    for key, value in upstream_resp.headers.raw:
+        key = key.lower()
+        if key not in drop:
+            headers.append((key, value))
+    headers.append((b"x-request-id", request_id.encode("latin-1")))
+    return headers
+
+
+def _stream_response(upstream_resp: httpx.Response, request_id: str) -> StreamingResponse:
+    """Pass the upstream body through untouched."""
+    response = StreamingResponse(
+        upstream_resp.aiter_raw(),
+        status_code=upstream_resp.status_code,
+        background=BackgroundTask(upstream_resp.aclose),
+    )
+    response.raw_headers.extend(_response_headers(upstream_resp, request_id, _PASSTHROUGH_DROP_HEADERS))
+    return response
+
+
+async def _masked_chunks(
+    upstream_resp: httpx.Response, mask_set: MaskSet, encoding: str
+) -> AsyncIterator[bytes]:
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    # Incremental so stateful codecs (e.g. a UTF-16 BOM) emit their prefix only once.
+    encoder = codecs.getincrementalencoder(encoding)(errors="replace")
+    stream = mask_set.stream()
+    async for chunk in upstream_resp.aiter_bytes(_READ_CHUNK_SIZE):
+        text = stream.feed(decoder.decode(chunk))
+        if text:
+            yield encoder.encode(text)
+    tail = stream.feed(decoder.decode(b"", final=True)) + stream.flush()
+    out = encoder.encode(tail, final=True)
+    if out:
+        yield out
+
+
+def _stream_masked_response(
+    upstream_resp: httpx.Response, request_id: str, mask_set: MaskSet
+) -> StreamingResponse:
+    """Mask the body while relaying it, holding back only the rules' match window."""
+    encoding = upstream_resp.encoding or "utf-8"
+    response = StreamingResponse(
+        _masked_chunks(upstream_resp, mask_set, encoding),
+        status_code=upstream_resp.status_code,
+        background=BackgroundTask(upstream_resp.aclose),
+    )
+    response.raw_headers.extend(_response_headers(upstream_resp, request_id, _DECODED_DROP_HEADERS))
+    return response
+
+
 async def process_response(
     upstream_resp: httpx.Response, route: RouteConfig, config: SystemConfig, request_id: str
 ) -> Response:
     """Handle upstream response and apply masking when needed."""
+    if not route.response_rules.mask_regex:
+        return _stream_response(upstream_resp, request_id)
+
     content_type = upstream_resp.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in MASKABLE_CONTENT_TYPES:
+        return _stream_response(upstream_resp, request_id)
+
+    mask_set = route.response_rules.mask_set
+    if mask_set.streamable:
+        return _stream_masked_response(upstream_resp, request_id, mask_set)
+
     raw_length = upstream_resp.headers.get("content-length")
     try:
         content_length = int(raw_length) if raw_length else 0
     except ValueError:
         content_length = 0
+    if content_length and content_length > config.proxy.max_response_size:
+        return _stream_response(upstream_resp, request_id)
 
-    if (
-        content_type not in MASKABLE_CONTENT_TYPES
-        or (content_length and content_length > config.proxy.max_response_size)
-    ):
-        headers = dict(upstream_resp.headers)
-        headers["X-Request-Id"] = request_id
-        return StreamingResponse(
-            upstream_resp.aiter_raw(),
-            status_code=upstream_resp.status_code,
-            headers=headers,
-            background=BackgroundTask(upstream_resp.aclose),
-        )
-
-    await upstream_resp.aread()
-    content = upstream_resp.text
+    # Without a declared length the whole body is masked, however large it turns out.
+    body = bytearray()
+    async for chunk in upstream_resp.aiter_bytes(_READ_CHUNK_SIZE):
+        body += chunk
     await upstream_resp.aclose()
 
-    masked = mask_content(content, route.response_rules.mask_regex)
-    headers = dict(upstream_resp.headers)
-    headers.pop("content-length", None)  # avoid mismatch after masking
-    headers["X-Request-Id"] = request_id
-
-    return Response(
-        content=masked,
+    # Decode and re-encode with the upstream charset so the forwarded content-type stays accurate.
+    encoding = upstream_resp.encoding or "utf-8"
+    masked = mask_content(body.decode(encoding, errors="replace"), mask_set)
+    # Response sets content-length for the masked body; content-type comes from upstream.
+    response = Response(
+        content=masked.encode(encoding, errors="replace"),
         status_code=upstream_resp.status_code,
-        headers=headers,
-        media_type=content_type or None,
     )
+    response.raw_headers.extend(_response_headers(upstream_resp, request_id, _DECODED_DROP_HEADERS))
+    return response
 
 
 async def forward_request(request: Request, route: RouteConfig) -> Response:
@@ -139,21 +256,42 @@ async def forward_request(request: Request, route: RouteConfig) -> Response:
     config: SystemConfig = request.app.state.config
     request_id = _request_id(request)
 
-    upstream_path = request.url.path[len(route.path) :] if request.url.path.startswith(route.path) else request.url.path
+    path = request.url.path
+    upstream_path = path[len(route.path) :] if path.startswith(route.path) else path
     if not upstream_path:
         upstream_path = "/"
     elif not upstream_path.startswith("/"):
         upstream_path = "/" + upstream_path
-    upstream_url = route.target.rstrip("/") + upstream_path
+    upstream_url = route.target_base + upstream_path
 
     req_params = merge_params(request.query_params, route.request_rules)
     req_headers = clean_headers(
-        request.headers,
-        strip_list=config.proxy.strip_headers,
-        add_headers=route.request_rules.add_headers,
+        request.headers.raw,
+        strip_set=config.proxy.strip_header_set,
+        add_headers=route.request_rules.raw_add_headers,
     )
 
-    body = await request.body()
+    max_request_size = config.proxy.max_request_size
+    headers = request.headers
+    body: bytes | AsyncIterator[bytes] | None
+    if "content-length" in headers or "transfer-encoding" in headers:
+        # Stream the body straight through; a forwarded content-length frames it upstream.
+        try:
+            declared_length = int(headers.get("content-length") or 0)
+        except ValueError:
+            declared_length = 0
+        if max_request_size and declared_length > max_request_size:
+            return error_response(413, "Payload Too Large", request, request_id)
+        body = _request_body(request, max_request_size)
+    else:
+        # Unframed (e.g. HTTP/2 without content-length): buffer whatever arrives so it is
+        # still forwarded, without making bodiless requests chunked upstream.
+        try:
+            chunks = [chunk async for chunk in _request_body(request, max_request_size)]
+        except RequestTooLarge:
+            return error_response(413, "Payload Too Large", request, request_id)
+        body = b"".join(chunks) or None
+
     start = time.monotonic()
     try:
         upstream_req = client.build_request(
@@ -164,6 +302,8 @@ async def forward_request(request: Request, route: RouteConfig) -> Response:
             content=body,
         )
         upstream_resp = await client.send(upstream_req, stream=True)
+    except RequestTooLarge:
+        return error_response(413, "Payload Too Large", request, request_id)
     except httpx.ConnectError:
         logger.warning(
             "Upstream connection failed",
@@ -183,16 +323,16 @@ async def forward_request(request: Request, route: RouteConfig) -> Response:
         )
         return error_response(502, "Bad Gateway", request, request_id)
 
-    duration_ms = int((time.monotonic() - start) * 1000)
-    logger.info(
-        "Request forwarded",
-        extra={
-            "request_id": request_id,
-            "route_name": route.name,
-            "upstream_ms": duration_ms,
-            "status_code": upstream_resp.status_code,
-            "method": request.method.upper(),
-            "path": str(request.url.path),
-        },
-    )
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "Request forwarded",
+            extra={
+                "request_id": request_id,
+                "route_name": route.name,
+                "upstream_ms": int((time.monotonic() - start) * 1000),
+                "status_code": upstream_resp.status_code,
+                "method": request.method.upper(),
+                "path": path,
+            },
+        )
     return await process_response(upstream_resp, route, config, request_id)
@@ -1,7 +1,13 @@
 import re
-from typing import Iterable
+from typing import TYPE_CHECKING, Callable, Iterable
 
-from ..core.models import MaskRule
+try:
+    from re import _parser as _sre_parser
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parser  # type: ignore[no-redef]
+
+if TYPE_CHECKING:
+    from ..core.models import MaskRule
 
 MASKABLE_CONTENT_TYPES = {
     "application/json",
@@ -11,10 +17,187 @@ MASKABLE_CONTENT_TYPES = {
     "application/xml",
 }
 
+_GROUP_PREFIX = "_spg_mask_"
+
+# Longest match a rule may have for responses to be masked while streaming; rule sets
+# with longer (or unbounded) patterns are masked on the fully buffered body instead.
+MAX_STREAM_WINDOW = 4096
+
+# Anchors, word boundaries and lookarounds depend on text outside the match itself.
+_CONTEXT_OPS = frozenset({_sre_parser.AT, _sre_parser.ASSERT, _sre_parser.ASSERT_NOT})
+# Numbered group references break once the pattern is wrapped into the fused alternation.
+_GROUPREF_OPS = frozenset({_sre_parser.GROUPREF, _sre_parser.GROUPREF_EXISTS})
+
+
+def _uses_ops(node: object, ops: frozenset) -> bool:
+    if isinstance(node, _sre_parser.SubPattern):
+        return any(op in ops or _uses_ops(av, ops) for op, av in node)
+    if isinstance(node, (list, tuple)):
+        return any(_uses_ops(item, ops) for item in node)
+    return False
+
+
+def _fusable(parsed: "_sre_parser.SubPattern") -> bool:
+    """Whether a parsed pattern keeps its meaning inside the fused alternation."""
+    # Global inline flags such as (?i) would apply to every rule (Python 3.10 only warns).
+    if parsed.state.flags & ~re.UNICODE:
+        return False
+    return not _uses_ops(parsed, _GROUPREF_OPS)
+
+
+def _stream_width(parsed: "_sre_parser.SubPattern") -> int | None:
+    """
+    Longest possible match of a parsed pattern if it can be applied to a sliding window.
+
+    That holds when every match is non-empty, at most MAX_STREAM_WINDOW characters long
+    and decided by its own characters alone; otherwise None.
+    """
+    low, high = parsed.getwidth()
+    if low == 0 or high > MAX_STREAM_WINDOW or _uses_ops(parsed, _CONTEXT_OPS):
+        return None
+    return high
+
+
+class MaskStream:
+    """
+    Incremental masking of text that arrives in pieces.
+
+    A match can be at most ``window`` characters long, so matches starting at least
+    ``window`` characters before the end of the pending text are final; the rest is
+    carried over to the next piece. The output equals masking the whole text at once.
+    """
+
+    __slots__ = ("_pattern", "_replace", "_window", "_pending")
+
+    def __init__(
+        self, pattern: re.Pattern[str], replace: Callable[[re.Match[str]], str], window: int
+    ) -> None:
+        self._pattern = pattern
+        self._replace = replace
+        self._window = window
+        self._pending = ""
+
+    def feed(self, text: str) -> str:
+        """Add ``text`` and return the masked output that is final so far."""
+        pending = self._pending + text
+        limit = len(pending) - self._window
+        if limit < 0:
+            self._pending = pending
+            return ""
+
+        out = []
+        pos = 0
+        for match in self._pattern.finditer(pending):
+            start = match.start()
+            if start > limit:
+                break
+            out.append(pending[pos:start])
+            out.append(self._replace(match))
+            pos = match.end()
+        # No match starts in [pos, limit], so that text is final as well.
+        cut = max(pos, limit + 1)
+        out.append(pending[pos:cut])
+        self._pending = pending[cut:]
+        return "".join(out)
+
+    def flush(self) -> str:
+        """Return the masked remainder once no more text will arrive."""
+        pending, self._pending = self._pending, ""
+        return self._pattern.sub(self._replace, pending)
+
+
+class MaskStreamChain:
+    """Sequential rules streamed in turn: each stage masks the output of the previous one."""
+
+    __slots__ = ("_stages",)
+
+    def __init__(self, stages: Iterable[MaskStream]) -> None:
+        self._stages = tuple(stages)
+
+    def feed(self, text: str) -> str:
+        """Add ``text`` and return the masked output that is final so far."""
+        for stage in self._stages:
+            text = stage.feed(text)
+        return text
+
+    def flush(self) -> str:
+        """Return the masked remainder once no more text will arrive."""
+        text = ""
+        for stage in self._stages:
+            text = stage.feed(text) + stage.flush()
+        return text
+
+
+class MaskSet:
+    """
+    Mask rules of a route, applied one after another in configured order.
+
+    With ``single_pass`` the rules are fused into a single alternation so content is
+    scanned once; at each position only the first rule (in configured order) that
+    matches is applied, so a rule no longer sees the output of the rules before it.
+    Patterns that cannot be combined (numbered group references, inline global flags,
+    duplicate group names) keep sequential masking.
+    """
+
+    __slots__ = ("_rules", "_fused", "_widths")
+
+    def __init__(self, rules: Iterable["MaskRule"], single_pass: bool = False) -> None:
+        self._rules = tuple(rules)
+        self._fused: re.Pattern[str] | None = None
+        parsed = [_sre_parser.parse(rule.pattern) for rule in self._rules]
+        if single_pass and len(self._rules) > 1 and all(_fusable(p) for p in parsed):
+            alternation = "|".join(
+                f"(?P<{_GROUP_PREFIX}{i}>{rule.pattern})" for i, rule in enumerate(self._rules)
+            )
+            try:
+                self._fused = re.compile(alternation)
+            except re.error:
+                self._fused = None
+
+        widths = [_stream_width(p) for p in parsed]
+        self._widths: tuple[int, ...] | None = (
+            tuple(widths) if self._rules and None not in widths else None  # type: ignore[arg-type]
+        )
+
+    @property
+    def streamable(self) -> bool:
+        """Whether content can be masked incrementally through stream()."""
+        return self._widths is not None
+
+    def stream(self) -> MaskStream | MaskStreamChain:
+        """Start incremental masking; only valid when ``streamable``."""
+        if self._widths is None:
+            raise ValueError("mask rules cannot be applied to streamed content")
+        if self._fused is not None:
+            return MaskStream(self._fused, self._replace, max(self._widths))
+        return MaskStreamChain(
+            MaskStream(rule.compiled, _expander(rule.replacement), width)
+            for rule, width in zip(self._rules, self._widths)
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self._rules)
+
+    def apply(self, content: str) -> str:
+        if self._fused is not None:
+            return self._fused.sub(self._replace, content)
+        for rule in self._rules:
+            content = rule.compiled.sub(rule.replacement, content)
+        return content
+
+    def _replace(self, match: re.Match[str]) -> str:
+        # The wrapping named group closes last, so lastgroup identifies the rule.
+        rule = self._rules[int(match.lastgroup[len(_GROUP_PREFIX) :])]  # type: ignore[index]
+        # Re-match with the rule's own pattern so \1-style references keep their numbering.
+        local = rule.compiled.match(match.string, match.start())
+        return local.expand(rule.replacement) if local else match.group()
+
+
+def _expander(replacement: str) -> Callable[[re.Match[str]], str]:
+    return lambda match: match.expand(replacement)
+
 
-def mask_content(content: str, rules: Iterable[MaskRule]) -> str:
+def mask_content(content: str, rules: "MaskSet | Iterable[MaskRule]") -> str:
     """Apply regex masking rules to content."""
-    masked = content
-    for rule in rules:
-        masked = re.sub(rule.pattern, rule.replacement, masked)
-    return masked
+    mask_set = rules if isinstance(rules, MaskSet) else MaskSet(rules)
+    return mask_set.apply(content)
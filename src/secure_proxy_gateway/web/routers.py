@@ -1,71 +1,115 @@
 from pathlib import Path
 
+import orjson
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from pydantic import ValidationError
 from starlette.concurrency import run_in_threadpool
-import ipaddress
 
-from ..core.runtime import apply_config, maybe_reload_app_config
+from ..core.runtime import apply_config, is_loopback_host, maybe_reload_app_config
 from ..core.config_mgr import (
     detect_config_format,
     read_raw_config,
     save_config,
     save_config_raw,
+    validate_config_data,
     validate_config_raw,
 )
 from ..core.models import SystemConfig
+from ..core.responses import ORJSONResponse
 
-router = APIRouter()
-templates = Jinja2Templates(directory=str(Path(__file__).resolve().parent / "templates"))
+router = APIRouter(default_response_class=ORJSONResponse)
+_TEMPLATE_DIR = Path(__file__).resolve().parent / "templates"
+templates = Jinja2Templates(directory=str(_TEMPLATE_DIR))
 
+_serialize_system_config = SystemConfig.__pydantic_serializer__.to_json
+
+# (template st_mtime_ns, rendered page); the page has no per-request content.
+_ui_cache: tuple[int, bytes] | None = None
+
+
+def _render_ui() -> bytes:
+    global _ui_cache
+    mtime_ns = (_TEMPLATE_DIR / "index.html").stat().st_mtime_ns
+    if _ui_cache is None or _ui_cache[0] != mtime_ns:
+        _ui_cache = (mtime_ns, templates.get_template("index.html").render().encode("utf-8"))
+    return _ui_cache[1]
+
+
+def _validation_detail(exc: ValidationError) -> list:
+    """Structured errors straight from pydantic-core, without formatting the text report."""
+    return exc.errors(include_url=False, include_context=False)
 
-def _is_loopback(host: str) -> bool:
-    try:
-        return ipaddress.ip_address(host).is_loopback
-    except ValueError:
-        return host.lower() == "localhost"
+
+def _minimal_requested(request: Request) -> bool:
+    return (request.headers.get("X-Config-Minimal") or "").strip() in {"1", "true", "yes", "on"}
+
+
+def _merge_config_data(base: dict, update: dict) -> dict:
+    """Deep-merge ``update`` into ``base`` in place; non-dict values (lists included) replace."""
+    for key, value in update.items():
+        current = base.get(key)
+        if isinstance(value, dict) and isinstance(current, dict):
+            _merge_config_data(current, value)
+        else:
+            base[key] = value
+    return base
+
+
+def _config_json(state) -> bytes:
+    """JSON of the active config, serialized by pydantic-core once per applied config."""
+    cached = state.config_json
+    if cached is None:
+        cached = state.config_json = _serialize_system_config(state.config)
+    return cached
 
 
 def _ensure_admin_access(request: Request) -> None:
-    client_host = request.client.host if request.client else None
-    admin_host = request.app.state.config.server.admin_host
+    client = request.scope.get("client")  # (host, port) or None, as set by the ASGI server
+    client_host = client[0] if client else None
+    state = request.app.state
     if not client_host:
         raise HTTPException(status_code=403, detail="Admin interface restricted")
-    if client_host == admin_host:
+    if client_host == state.admin_host:
         return
-    if _is_loopback(client_host) and _is_loopback(admin_host):
+    if state.admin_is_loopback and is_loopback_host(client_host):
         return
-    if client_host != admin_host:
-        raise HTTPException(status_code=403, detail="Admin interface restricted")
+    raise HTTPException(status_code=403, detail="Admin interface restricted")
 
 
 @router.get("/ui", response_class=HTMLResponse)
 async def ui(request: Request):
     _ensure_admin_access(request)
-    return templates.TemplateResponse("index.html", {"request": request})
+    return HTMLResponse(content=_render_ui())
 
 
 @router.get("/api/config")
 async def get_current_config(request: Request):
     _ensure_admin_access(request)
-    await maybe_reload_app_config(request.app)
-    config_path = request.app.state.config_path
-    raw_content, fmt = await run_in_threadpool(read_raw_config, config_path)
-    return {
-        "config": request.app.state.config.model_dump(),
-        "raw": raw_content,
-        "format": fmt,
-        "path": str(config_path),
-    }
+    # The admin view should always reflect the file on disk.
+    await maybe_reload_app_config(request.app, force=True)
+    state = request.app.state
+    config_path = state.config_path
+    raw_content, fmt = state.config_raw, state.config_format
+    if raw_content is None:
+        raw_content, fmt = await run_in_threadpool(read_raw_config, config_path)
+    # Returned as a response (not a dict) so the cached JSON is embedded without re-encoding.
+    return ORJSONResponse(
+        {
+            "config": orjson.Fragment(_config_json(state)),
+            "raw": raw_content,
+            "format": fmt,
+            "path": str(config_path),
+        }
+    )
 
 
 @router.post("/api/config")
 async def update_config(payload: dict, request: Request):
     _ensure_admin_access(request)
     config_path = request.app.state.config_path
-    minimal = (request.headers.get("X-Config-Minimal") or "").strip() in {"1", "true", "yes", "on"}
+    minimal = _minimal_requested(request)
     # New path: accept raw content with format hint to avoid format conversion
     if "content" in payload:
         content = payload.get("content") or ""
@@ -75,25 +119,56 @@ async def update_config(payload: dict, request: Request):
         except Exception as exc:
             raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-        await apply_config(request.app, new_config, fmt)
+        await apply_config(request.app, new_config, fmt, content)
         return {"ok": True, "format": fmt}
 
     # Backward compatibility: accept structured JSON config
     try:
-        new_config = SystemConfig.model_validate(payload)
+        new_config = validate_config_data(payload)
     except ValidationError as exc:
-        raise HTTPException(status_code=400, detail=str(exc))
+        raise HTTPException(status_code=400, detail=_validation_detail(exc)) from exc
 
     fmt = getattr(request.app.state, "config_format", "yaml")
     try:
-        await run_in_threadpool(save_config, new_config, config_path, fmt, minimal)
+        content = await run_in_threadpool(save_config, new_config, config_path, fmt, minimal)
     except Exception as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    await apply_config(request.app, new_config, fmt)
+    await apply_config(request.app, new_config, fmt, content)
     return {"ok": True}
 
 
+@router.post("/api/config/batch")
+async def update_config_batch(payload: dict, request: Request):
+    """Apply several partial updates with one validation, one write and one reload."""
+    _ensure_admin_access(request)
+    updates = payload.get("updates")
+    if not isinstance(updates, list) or not all(isinstance(item, dict) for item in updates):
+        raise HTTPException(status_code=400, detail="updates 必须是对象数组")
+
+    await maybe_reload_app_config(request.app, force=True)
+    state = request.app.state
+    # model_dump keeps inf/nan floats, which a JSON round-trip would turn into null.
+    data = state.config.model_dump()
+    for update in updates:
+        _merge_config_data(data, update)
+    try:
+        new_config = validate_config_data(data)
+    except ValidationError as exc:
+        raise HTTPException(status_code=400, detail=_validation_detail(exc)) from exc
+
+    fmt = state.config_format
+    try:
+        content = await run_in_threadpool(
+            save_config, new_config, state.config_path, fmt, _minimal_requested(request)
+        )
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    await apply_config(request.app, new_config, fmt, content)
+    return {"ok": True, "applied": len(updates)}
+
+
 @router.post("/api/config/validate")
 async def validate_config(payload: dict, request: Request):
     _ensure_admin_access(request)
@@ -104,10 +179,10 @@ async def validate_config(payload: dict, request: Request):
             cfg = await run_in_threadpool(validate_config_raw, content, fmt)
         except Exception as exc:
             raise HTTPException(status_code=400, detail=str(exc)) from exc
-        return {"ok": True, "config": cfg.model_dump()}
+        return ORJSONResponse({"ok": True, "config": orjson.Fragment(_serialize_system_config(cfg))})
 
     try:
-        cfg = SystemConfig.model_validate(payload)
+        cfg = validate_config_data(payload)
     except ValidationError as exc:
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
-    return {"ok": True, "config": cfg.model_dump()}
+        raise HTTPException(status_code=400, detail=_validation_detail(exc)) from exc
+    return ORJSONResponse({"ok": True, "config": orjson.Fragment(_serialize_system_config(cfg))})
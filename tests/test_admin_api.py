@@ -0,0 +1,77 @@
+import pytest
+import yaml
+from fastapi.testclient import TestClient
+
+from secure_proxy_gateway.core import config_mgr
+from secure_proxy_gateway.main import app
+from secure_proxy_gateway.web.routers import _merge_config_data
+
+
+@pytest.fixture
+def admin_client(tmp_path, monkeypatch):
+    cfg_path = tmp_path / "config.yaml"
+    cfg_path.write_text(
+        "proxy:\n  timeout: {connect: 5.0, read: 30.0}\n"
+        "routes:\n- {name: a, path: /a, target: http://a.local}\n",
+        encoding="utf-8",
+    )
+    monkeypatch.setenv(config_mgr.ENV_CONFIG_PATH, str(cfg_path))
+    with TestClient(app, client=("127.0.0.1", 50000)) as client:
+        yield client, cfg_path
+
+
+def test_merge_config_data_deep_merges_dicts_and_replaces_lists():
+    base = {"proxy": {"timeout": {"connect": 5.0, "read": 30.0}}, "routes": [{"name": "a"}]}
+    _merge_config_data(base, {"proxy": {"timeout": {"read": 9.0}}, "routes": [{"name": "b"}]})
+    assert base == {"proxy": {"timeout": {"connect": 5.0, "read": 9.0}}, "routes": [{"name": "b"}]}
+
+
+def test_batch_update_merges_updates_in_order(admin_client):
+    client, cfg_path = admin_client
+    resp = client.post(
+        "/api/config/batch",
+        json={"updates": [{"proxy": {"timeout": {"read": 9.0}}}, {"server": {"port": 8100}}]},
+    )
+    assert resp.status_code == 200
+    assert resp.json() == {"ok": True, "applied": 2}
+
+    saved = yaml.safe_load(cfg_path.read_text(encoding="utf-8"))
+    assert saved["proxy"]["timeout"] == {"connect": 5.0, "read": 9.0, "write": 30.0}
+    assert saved["server"]["port"] == 8100
+    assert [route["name"] for route in saved["routes"]] == ["a"]
+    assert app.state.config.proxy.timeout.read == 9.0
+
+
+def test_batch_update_rejects_whole_batch_on_invalid_update(admin_client):
+    client, cfg_path = admin_client
+    before = cfg_path.read_bytes()
+    resp = client.post(
+        "/api/config/batch",
+        json={"updates": [{"server": {"port": 8100}}, {"routes": [{"name": "broken"}]}]},
+    )
+    assert resp.status_code == 400
+    assert cfg_path.read_bytes() == before
+    assert app.state.config.server.port == 8000
+
+
+@pytest.mark.parametrize("payload", [{}, {"updates": {"server": {}}}, {"updates": [1]}])
+def test_batch_update_requires_list_of_objects(admin_client, payload):
+    client, _ = admin_client
+    resp = client.post("/api/config/batch", json=payload)
+    assert resp.status_code == 400
+
+
+def test_batch_update_keeps_non_finite_values(admin_client):
+    client, cfg_path = admin_client
+    cfg_path.write_text(
+        "proxy:\n  timeout: {connect: 5.0, read: .inf}\n"
+        "routes:\n- {name: a, path: /a, target: http://a.local}\n",
+        encoding="utf-8",
+    )
+    resp = client.post("/api/config/batch", json={"updates": [{"server": {"port": 8100}}]})
+    assert resp.status_code == 200
+
+    saved = yaml.safe_load(cfg_path.read_text(encoding="utf-8"))
+    assert saved["proxy"]["timeout"]["read"] == float("inf")
+    assert saved["server"]["port"] == 8100
+    assert app.state.config.proxy.timeout.read == float("inf")
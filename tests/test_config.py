@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 import yaml
@@ -25,6 +26,7 @@ def test_save_and_load_with_backup(tmp_path):
     config_mgr.save_config(cfg, path=cfg_path)
     backup = Path(str(cfg_path) + ".bak")
     assert backup.exists()
+    assert "updated" not in backup.read_text(encoding="utf-8")
 
     loaded = config_mgr.load_config(cfg_path)
     assert loaded.routes[0].description == "updated"
@@ -44,3 +46,106 @@ def test_resolve_config_path_searches_upwards(tmp_path, monkeypatch):
 
     resolved = config_mgr.resolve_config_path()
     assert resolved == cfg_path
+
+    # A config created closer to the CWD later on takes precedence.
+    closer = src_dir / "config.yaml"
+    closer.write_text("server: {}\n", encoding="utf-8")
+    assert config_mgr.resolve_config_path() == closer
+
+
+def test_load_config_reuses_parse_until_file_changes(tmp_path, monkeypatch):
+    cfg_path = tmp_path / "config.yaml"
+    cfg_path.write_text("server: {port: 9001}\n", encoding="utf-8")
+    assert config_mgr.load_config(cfg_path).server.port == 9001
+
+    def _fail(*_args):
+        raise AssertionError("config re-parsed while unchanged")
+
+    monkeypatch.setattr(config_mgr, "_parse_config", _fail)
+    assert config_mgr.load_config(cfg_path).server.port == 9001
+
+    monkeypatch.undo()
+    cfg_path.write_text("server: {port: 19002}\n", encoding="utf-8")
+    assert config_mgr.load_config(cfg_path).server.port == 19002
+
+
+def test_resolve_config_path_search_is_bounded(tmp_path, monkeypatch):
+    (tmp_path / "config.yaml").write_text("server: {}\n", encoding="utf-8")
+    deep_dir = tmp_path.joinpath(*["d"] * (config_mgr.MAX_CONFIG_SEARCH_DEPTH + 1))
+    deep_dir.mkdir(parents=True)
+
+    monkeypatch.chdir(deep_dir)
+    monkeypatch.delenv(config_mgr.ENV_CONFIG_PATH, raising=False)
+
+    assert config_mgr.resolve_config_path() == deep_dir / "config.yaml"
+
+
+def test_load_config_full_returns_raw_and_format(tmp_path):
+    cfg_path = tmp_path / "config.json"
+    raw = '{"server": {"port": 9002}}'
+    cfg_path.write_text(raw, encoding="utf-8")
+
+    config, content, fmt = config_mgr.load_config_full(cfg_path)
+    assert config.server.port == 9002
+    assert content == raw
+    assert fmt == "json"
+
+    config, content, fmt = config_mgr.load_config_full(tmp_path / "missing.yaml")
+    assert config == config_mgr.SystemConfig()
+    assert (content, fmt) == ("", "yaml")
+
+
+def test_save_config_skips_unchanged_content(tmp_path):
+    cfg_path = tmp_path / "config.yaml"
+    cfg = SystemConfig()
+    config_mgr.save_config(cfg, path=cfg_path)
+    config_mgr.save_config(cfg, path=cfg_path)
+
+    assert not Path(str(cfg_path) + ".bak").exists()
+
+
+def test_load_config_cache_keeps_non_finite_floats(tmp_path):
+    cfg_path = tmp_path / "config.yaml"
+    cfg_path.write_text(
+        "proxy:\n  timeout: {read: .inf}\nroutes:\n"
+        "- {name: a, path: /a, target: http://x, response_rules: {mask_regex: [{pattern: '\\d', replacement: '#'}]}}\n",
+        encoding="utf-8",
+    )
+
+    first = config_mgr.load_config(cfg_path)
+    first.routes[0].name = "mutated"
+    second = config_mgr.load_config(cfg_path)
+
+    assert second.proxy.timeout.read == float("inf")
+    assert second.routes[0].name == "a"
+    assert second.routes[0].response_rules.mask_set.apply("a1") == "a#"
+
+
+def test_save_config_round_trips_non_finite_floats(tmp_path):
+    cfg = SystemConfig.model_validate({"proxy": {"timeout": {"read": float("inf")}}})
+    cfg_path = tmp_path / "config.yaml"
+
+    config_mgr.save_config(cfg, path=cfg_path)
+    assert config_mgr.load_config(cfg_path).proxy.timeout.read == float("inf")
+
+
+def test_json_config_round_trips_non_finite_floats(tmp_path):
+    cfg = SystemConfig.model_validate({"proxy": {"timeout": {"read": float("inf")}}})
+    cfg_path = tmp_path / "config.json"
+
+    config_mgr.save_config(cfg, path=cfg_path, fmt="json")
+    assert config_mgr.load_config(cfg_path).proxy.timeout.read == float("inf")
+
+
+def test_save_config_does_not_write_through_tmp_symlink(tmp_path):
+    cfg_path = tmp_path / "config.yaml"
+    victim = tmp_path / "victim.txt"
+    victim.write_text("keep me", encoding="utf-8")
+    tmp_file = tmp_path / f"config.yaml.tmp.{os.getpid()}"
+    tmp_file.symlink_to(victim)
+
+    config_mgr.save_config(SystemConfig(), path=cfg_path)
+
+    assert victim.read_text(encoding="utf-8") == "keep me"
+    assert config_mgr.load_config(cfg_path) == SystemConfig()
+    assert not tmp_file.exists() and not tmp_file.is_symlink()
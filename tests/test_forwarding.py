@@ -0,0 +1,71 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from starlette.requests import Request
+
+from secure_proxy_gateway.core.models import RouteConfig, SystemConfig
+from secure_proxy_gateway.proxy.engine import forward_request
+
+ROUTE = RouteConfig(name="up", path="/up", target="http://upstream.local")
+
+
+def _forward(headers: dict[str, str], chunks: list[bytes], max_request_size: int = 0):
+    """Run forward_request against a mock upstream; returns (response, bodies seen upstream)."""
+    received: list[bytes] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received.append(request.read())
+        return httpx.Response(200, text="ok")
+
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1}
+        for i, chunk in enumerate(chunks or [b""])
+    ]
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            state = SimpleNamespace(
+                http_client=client,
+                config=SystemConfig.model_validate({"proxy": {"max_request_size": max_request_size}}),
+            )
+            scope = {
+                "type": "http",
+                "method": "POST",
+                "path": "/up/items",
+                "query_string": b"",
+                "headers": [(k.encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()],
+                "app": SimpleNamespace(state=state),
+            }
+            return await forward_request(Request(scope, receive), ROUTE)
+
+    return asyncio.run(run()), received
+
+
+def test_forward_request_streams_body_upstream():
+    resp, received = _forward({"content-length": "10"}, [b"hello", b"world"], max_request_size=10)
+    assert resp.status_code == 200
+    assert received == [b"helloworld"]
+
+
+def test_forward_request_rejects_declared_length_over_limit():
+    resp, received = _forward({"content-length": "11"}, [b"hello world"], max_request_size=10)
+    assert resp.status_code == 413
+    assert received == []
+
+
+def test_forward_request_rejects_streamed_body_crossing_limit():
+    resp, _ = _forward({"transfer-encoding": "chunked"}, [b"hello", b"world", b"!"], max_request_size=10)
+    assert resp.status_code == 413
+
+
+@pytest.mark.parametrize(("max_request_size", "status"), [(0, 200), (4, 413)])
+def test_forward_request_keeps_unframed_body(max_request_size, status):
+    resp, received = _forward({}, [b"h2 ", b"body"], max_request_size=max_request_size)
+    assert resp.status_code == status
+    if status == 200:
+        assert received == [b"h2 body"]
@@ -1,7 +1,11 @@
+import asyncio
+
+import httpx
 import pytest
 
-from secure_proxy_gateway.core.models import MaskRule
-from secure_proxy_gateway.proxy.masking import mask_content
+from secure_proxy_gateway.core.models import MaskRule, RouteConfig, SystemConfig
+from secure_proxy_gateway.proxy.engine import process_response
+from secure_proxy_gateway.proxy.masking import MaskSet, mask_content
 
 
 def test_mask_content_applies_rules():
@@ -13,3 +17,133 @@ def test_mask_content_applies_rules():
 def test_mask_rule_validation_len():
     with pytest.raises(ValueError):
         MaskRule(pattern="a" * 501, replacement="x")
+
+
+def test_mask_set_applies_rules_to_previous_output_by_default():
+    rules = [
+        MaskRule(pattern=r"\w+@", replacement="***@"),
+        MaskRule(pattern=r"@\w+\.com", replacement="@***"),
+    ]
+    assert mask_content("mail bob@gmail.com", MaskSet(rules)) == "mail ***@***"
+
+    rules = [MaskRule(pattern="bar", replacement="X"), MaskRule(pattern="foobar", replacement="Y")]
+    assert mask_content("foobar", MaskSet(rules)) == "fooX"
+
+
+def test_mask_set_single_pass_fuses_rules_with_local_backreferences():
+    rules = [
+        MaskRule(pattern=r"(\d{3})\d{4}(\d{4})", replacement=r"\1****\2"),
+        MaskRule(pattern=r"(?P<user>\w+)@example\.com", replacement=r"\g<user>@***"),
+    ]
+    masked = mask_content(
+        "Phone: 13812345678, mail: bob@example.com", MaskSet(rules, single_pass=True)
+    )
+    assert masked == "Phone: 138****5678, mail: bob@***"
+
+    rules = [MaskRule(pattern="bar", replacement="X"), MaskRule(pattern="foobar", replacement="Y")]
+    assert mask_content("foobar", MaskSet(rules, single_pass=True)) == "Y"
+
+
+def test_mask_set_falls_back_when_patterns_cannot_be_fused():
+    rules = [
+        MaskRule(pattern=r"(?P<v>\d+)", replacement="#"),
+        MaskRule(pattern=r"(?P<v>[a-z]+)", replacement="*"),
+    ]
+    assert mask_content("abc 123", MaskSet(rules, single_pass=True)) == "* #"
+
+
+def test_mask_rule_validation_invalid_regex():
+    with pytest.raises(ValueError):
+        MaskRule(pattern="(", replacement="x")
+
+
+@pytest.mark.parametrize("single_pass", [False, True])
+def test_mask_stream_matches_whole_body_masking(single_pass):
+    rules = [
+        MaskRule(pattern=r"(\d{3})\d{4}(\d{4})", replacement=r"\1****\2"),
+        MaskRule(pattern=r"(?P<user>\w{1,16})@example\.com", replacement=r"\g<user>@***"),
+        MaskRule(pattern=r"\w{1,8}@", replacement="***@"),
+        MaskRule(pattern=r"@\w{1,8}\.com", replacement="@***"),
+    ]
+    mask_set = MaskSet(rules, single_pass=single_pass)
+    text = "a: 13812345678, b: bob@example.com, c: 13912345678, d: eve@gmail.com" * 3
+    assert mask_set.streamable
+
+    for size in (1, 2, 5, 11, 64):
+        stream = mask_set.stream()
+        pieces = [stream.feed(text[i : i + size]) for i in range(0, len(text), size)]
+        pieces.append(stream.flush())
+        assert "".join(pieces) == mask_set.apply(text)
+
+
+def test_mask_set_streams_only_bounded_context_free_rules():
+    assert not MaskSet([MaskRule(pattern=r"\d+", replacement="#")]).streamable
+    assert not MaskSet([MaskRule(pattern=r"\bid\d{2}", replacement="#")]).streamable
+    assert not MaskSet([MaskRule(pattern=r"x?", replacement="#")]).streamable
+    assert MaskSet([MaskRule(pattern=r"id\d{2,4}", replacement="#")]).streamable
+
+
+def test_mask_set_keeps_numbered_backreferences_in_later_rules():
+    rules = [
+        MaskRule(pattern="x", replacement="X"),
+        MaskRule(pattern=r"(b)\1", replacement="#"),
+    ]
+    mask_set = MaskSet(rules, single_pass=True)
+    assert mask_content("bb x", mask_set) == "# X"
+    assert mask_set.streamable
+
+
+def test_mask_set_does_not_fuse_global_inline_flags():
+    rules = [
+        MaskRule(pattern="abc", replacement="#"),
+        MaskRule(pattern="(?i)xyz", replacement="*"),
+    ]
+    assert mask_content("ABC xyz XYZ", MaskSet(rules, single_pass=True)) == "ABC * *"
+
+
+def test_streamed_masking_keeps_a_single_utf16_bom():
+    route = RouteConfig.model_validate(
+        {
+            "name": "a",
+            "path": "/a",
+            "target": "http://upstream",
+            "response_rules": {"mask_regex": [{"pattern": r"(\d{3})\d{4}(\d{4})", "replacement": r"\1****\2"}]},
+        }
+    )
+    text = "tel 13812345678; " * 8000
+    body = text.encode("utf-16")
+    upstream = httpx.Response(
+        200, headers={"content-type": "text/plain; charset=utf-16"}, content=body
+    )
+
+    async def collect() -> bytes:
+        response = await process_response(upstream, route, SystemConfig(), "rid")
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    out = asyncio.run(collect())
+    assert out.decode("utf-16") == text.replace("13812345678", "138****5678")
+
+
+def test_buffered_masking_covers_undeclared_length_over_max_response_size():
+    route = RouteConfig.model_validate(
+        {
+            "name": "a",
+            "path": "/a",
+            "target": "http://upstream",
+            "response_rules": {"mask_regex": [{"pattern": r"\d+", "replacement": "#"}]},
+        }
+    )
+    config = SystemConfig.model_validate({"proxy": {"max_response_size": 16}})
+
+    async def chunked():
+        for _ in range(4):
+            yield b"id 12345678; "
+
+    upstream = httpx.Response(200, headers={"content-type": "text/plain"}, content=chunked())
+    assert "content-length" not in upstream.headers
+
+    async def collect() -> bytes:
+        response = await process_response(upstream, route, config, "rid")
+        return response.body
+
+    assert asyncio.run(collect()) == b"id #; " * 4
@@ -1,5 +1,5 @@
-from secure_proxy_gateway.proxy.engine import match_route
-from secure_proxy_gateway.core.models import RequestRules, ResponseRules, RouteConfig
+from secure_proxy_gateway.proxy.engine import RouteTable, clean_headers, match_route
+from secure_proxy_gateway.core.models import ProxyConfig, RequestRules, ResponseRules, RouteConfig
 
 
 def test_match_route_longest_prefix():
@@ -44,3 +44,30 @@ def test_match_route_method_filter():
     assert has_path_match is True
     assert matched is not None
     assert matched.name == "orders"
+
+
+def test_route_table_prefers_explicit_method_over_wildcard():
+    routes = [
+        RouteConfig(name="any", path="/api/items", target="https://example.com"),
+        RouteConfig(name="post", path="/api/items/", target="https://example.com", method="post"),
+    ]
+    table = RouteTable(routes)
+
+    matched, has_path_match = match_route("/api/items/1", "POST", table)
+    assert has_path_match is True
+    assert matched is not None
+    assert matched.name == "post"
+
+    matched, _ = match_route("/api/items/1", "get", table)
+    assert matched is not None
+    assert matched.name == "any"
+
+    assert match_route("/other", "GET", table) == (None, False)
+
+
+def test_clean_headers_strips_and_overrides_raw_pairs():
+    raw = [(b"host", b"gw.local"), (b"x-source", b"client"), (b"accept", b"*/*"), (b"accept", b"text/html")]
+    rules = RequestRules(add_headers={"X-Source": "gw"})
+
+    cleaned = clean_headers(raw, ProxyConfig().strip_header_set, rules.raw_add_headers)
+    assert cleaned == [(b"accept", b"*/*"), (b"accept", b"text/html"), (b"x-source", b"gw")]